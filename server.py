@@ -1,18 +1,25 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse
+from fastapi.responses import ORJSONResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-import json
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+import asyncio
+import gzip
+import mimetypes
 import os
 import re
+import signal
 from collections import Counter
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
+from xml.sax.saxutils import escape as xml_escape
 
+import orjson
 from dotenv import load_dotenv
 load_dotenv()
 
-# Twilio for WhatsApp replies
-from twilio.twiml.messaging_response import MessagingResponse
-
 # Local modules
 import vaccinations
 import preventive_health
@@ -21,43 +28,182 @@ import languages
 
 # ------------------ basic setup ------------------
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Text assets worth compressing, and long-lived caching for fingerprinted
+# names like app.3f9a1c2b.js (plain names such as script.js revalidate via ETag)
+COMPRESSIBLE_EXTS = (".js", ".css", ".html", ".svg")
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.[^.]+$")
+
+def precompress_static(directory: str) -> None:
+    """Write a .gz next to each text asset that lacks an up-to-date one."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTS):
+                continue
+            src = os.path.join(root, name)
+            dst = src + ".gz"
+            if os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src):
+                continue
+            try:
+                with open(src, "rb") as f:
+                    data = gzip.compress(f.read(), compresslevel=9, mtime=0)
+                with open(dst, "wb") as f:
+                    f.write(data)
+            except OSError as e:
+                # e.g. read-only filesystem: the uncompressed file is still served
+                print("[static] could not precompress", src, e)
+
+PRECOMPRESSED_EXTS = (".gz", ".br")
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Content codings from an Accept-Encoding header, minus those with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a precompressed .br/.gz sibling when the client
+    accepts it (.br files come from the build, e.g. `brotli -k`), and sets
+    Cache-Control per asset. Siblings are discovered once at mount time, so
+    requests never probe for files that don't exist; restart to pick up new ones.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Relative asset path -> encodings it has a sibling for, in preference order
+        self.precompressed: dict[str, tuple[tuple[str, str], ...]] = {}
+        if not self.directory:
+            return
+        for root, _, files in os.walk(self.directory):
+            names = set(files)
+            for name in files:
+                if not name.endswith(COMPRESSIBLE_EXTS):
+                    continue
+                found = tuple(
+                    (encoding, ext) for encoding, ext in (("br", ".br"), ("gzip", ".gz"))
+                    if name + ext in names
+                )
+                if found:
+                    rel = os.path.relpath(os.path.join(root, name), self.directory)
+                    self.precompressed[os.path.normpath(rel)] = found
+
+    async def get_response(self, path: str, scope):
+        # The .gz/.br siblings are only served through Content-Encoding;
+        # fetched directly they would be compressed bytes labelled as JS/CSS
+        if path.endswith(PRECOMPRESSED_EXTS):
+            raise HTTPException(status_code=404)
+
+        response = None
+        if path.endswith(COMPRESSIBLE_EXTS):
+            accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+            for encoding, ext in self.precompressed.get(path, ()):
+                if encoding not in accepted:
+                    continue
+                try:
+                    candidate = await super().get_response(path + ext, scope)
+                except HTTPException:
+                    continue
+                if candidate.status_code in (200, 304):
+                    response = candidate
+                    response.headers["Content-Encoding"] = encoding
+                    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    if media_type.startswith("text/"):
+                        media_type += "; charset=utf-8"
+                    response.headers["Content-Type"] = media_type
+                    break
+            if response is None:
+                response = await super().get_response(path, scope)
+            response.headers["Vary"] = "Accept-Encoding"
+        else:
+            response = await super().get_response(path, scope)
+
+        if HASHED_ASSET_RE.search(path):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, no-cache"
+        return response
+
 if os.path.isdir("public"):
-    app.mount("/public", StaticFiles(directory="public"), name="public")
+    precompress_static("public")
+    app.mount("/public", PrecompressedStaticFiles(directory="public"), name="public")
 
 # Load FAQ DB 
 DB_PATH = "db.json"
-DB = {}
-if os.path.exists(DB_PATH):
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        DB = json.load(f)
 
-print("DB loaded keys:", list(DB.keys()))
+def load_db() -> dict:
+    if not os.path.exists(DB_PATH):
+        return {}
+    with open(DB_PATH, "rb") as f:
+        return orjson.loads(f.read())
+
+DB: dict = {}
 
 # ------------------ simple NLP index over FAQ ------------------
 
-STOP_WORDS = {
+STOP_WORDS = frozenset({
     "a", "an", "the", "is", "are", "am", "i", "you", "he", "she", "it", "we", "they",
     "of", "for", "to", "in", "on", "and", "or", "but", "with", "at", "from",
     "this", "that", "these", "those", "about", "what", "how", "when", "why",
     "do", "does", "did", "my", "your", "his", "her", "their", "our", "have",
     "has", "had", "me", "be", "been", "was", "were"
-}
+})
 
-DISEASE_DOCS: dict[str, set[str]] = {}
-
-def _tokenize(text: str) -> list[str]:
-    tokens = re.findall(r"\w+", text.lower())
-    return [t for t in tokens if t not in STOP_WORDS]
+_TOKEN_RE = re.compile(r"\w+")
 
-def build_disease_index() -> None:
-    global DISEASE_DOCS
-    DISEASE_DOCS = {}
-
-    if not DB:
-        return
+DISEASE_DOCS: dict[str, set[str]] = {}
+# Inverted index: token -> disease keys whose doc contains it
+TOKEN_INDEX: dict[str, tuple[str, ...]] = {}
+# Minimum shared tokens before nlp_guess_disease trusts a guess
+NLP_MIN_OVERLAP = 3
+
+# Normalized disease-name variant -> canonical DB key, plus one compiled
+# alternation so a typed disease name is found with a single regex scan.
+DISEASE_VARIANTS: dict[str, str] = {}
+DISEASE_RE: re.Pattern | None = None
+
+# Names that don't start with their DB key ("hypothyroidism" -> thyroid)
+DISEASE_ALIASES = {
+    "hypothyroid": "thyroid",
+    "hyperthyroid": "thyroid",
+    "prediabet": "diabetes",
+}
+# Names whose last word is this short must end there (plus an optional "s")
+SHORT_NAME_TAIL = 4
+_NAME_SPLIT_RE = re.compile(r"[ _-]")
+
+def _tokenize_set(text: str, *, already_lower: bool = False) -> set[str]:
+    if not already_lower:
+        text = text.lower()
+    return {t for t in _TOKEN_RE.findall(text) if t not in STOP_WORDS}
+
+def build_disease_index(db: dict) -> tuple[dict[str, set[str]], dict[str, tuple[str, ...]]]:
+    """Build (DISEASE_DOCS, TOKEN_INDEX) for `db` without touching the globals."""
+    docs: dict[str, set[str]] = {}
+
+    for disease_key, disease_data in db.items():
+        # Tokens cached by an earlier build (see reload_db)
+        cached = disease_data.get("_doc_tokens")
+        if cached is not None:
+            if cached:
+                docs[disease_key] = cached
+            continue
 
-    for disease_key, disease_data in DB.items():
         lang_block = disease_data.get("en")
         if not lang_block:
             continue
@@ -73,37 +219,167 @@ def build_disease_index() -> None:
         if not parts:
             continue
 
-        doc = " ".join(parts)
-        tokens = _tokenize(doc)
+        tokens = _tokenize_set(" ".join(parts))
+        disease_data["_doc_tokens"] = tokens
         if tokens:
-            DISEASE_DOCS[disease_key] = set(tokens)
-
-    print("DISEASE_DOCS built for:", list(DISEASE_DOCS.keys()))
+            docs[disease_key] = tokens
+
+    postings: dict[str, list[str]] = {}
+    for key, toks in docs.items():
+        for t in toks:
+            postings.setdefault(t, []).append(key)
+    # Postings never change after build, so store them compactly
+    token_index = {t: tuple(keys) for t, keys in postings.items()}
+
+    print("DISEASE_DOCS built for:", list(docs.keys()))
+    return docs, token_index
+
+def build_disease_name_index(db: dict) -> tuple[dict[str, str], re.Pattern | None]:
+    """Build (DISEASE_VARIANTS, DISEASE_RE) for `db` without touching the globals."""
+    variants: dict[str, str] = {}
+    if not db:
+        return variants, None
+
+    for key in db:
+        k_low = key.lower()
+        for variant in {k_low, k_low.replace("_", " "), k_low.replace("-", " ")}:
+            variants.setdefault(variant, key)
+    for alias, key in DISEASE_ALIASES.items():
+        if key in db:
+            variants.setdefault(alias, key)
+
+    # Names start on a word boundary ("uti" is not found in "institution").
+    # Most may run on into a longer word ("cancerous", "covid19", "strokes"),
+    # but names whose last word is short only take a plain plural, so
+    # "hives" doesn't read as hiv and "hepatitis and" not as hepatitis a.
+    open_ended = [v for v in variants if len(_NAME_SPLIT_RE.split(v)[-1]) > SHORT_NAME_TAIL]
+    strict = [v for v in variants if len(_NAME_SPLIT_RE.split(v)[-1]) <= SHORT_NAME_TAIL]
+    alternatives = []
+    if open_ended:
+        alternatives.append("(" + _trie_pattern(open_ended) + r")\w*")
+    if strict:
+        alternatives.append("(" + _trie_pattern(strict) + r")s?\b")
+    return variants, re.compile(r"\b(?:" + "|".join(alternatives) + ")")
+
+def _trie_pattern(words) -> str:
+    """
+    Regex source for `words` with shared prefixes factored out, so the engine
+    walks a character trie instead of retrying every name at each position.
+    Optional suffixes are greedy, so the longest name at a position wins
+    ("heat stroke" over "heat", "hepatitis b" over "hepatitis").
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-word marker
+
+    def walk(node: dict) -> str:
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = "(?:" + body + ")?"
+        return body
+
+    return walk(trie)
+
+def match_disease_name(q: str) -> str | None:
+    """Return the DB key of a disease named in the (lowercased) query, if any."""
+    if DISEASE_RE is None:
+        return None
+    m = DISEASE_RE.search(q)
+    # Only one of the two name groups takes part in a match
+    return DISEASE_VARIANTS[m[m.lastindex]] if m else None
 
-def nlp_guess_disease(text: str) -> str | None:
+def nlp_guess_disease(text: str, tokens: set[str] | None = None) -> str | None:
     if not DISEASE_DOCS:
         return None
 
-    tokens = set(_tokenize(text))
+    if tokens is None:
+        tokens = _tokenize_set(text)
     if not tokens:
         return None
 
-    best_key = None
-    best_overlap = 0
+    # A disease can only reach the threshold if enough query tokens are
+    # known at all, so unrelated text is rejected before any tallying
+    postings = [TOKEN_INDEX[t] for t in tokens if t in TOKEN_INDEX]
+    if len(postings) < NLP_MIN_OVERLAP:
+        return None
 
-    for disease_key, doc_tokens in DISEASE_DOCS.items():
-        overlap = len(tokens & doc_tokens)
-        if overlap > best_overlap:
-            best_overlap = overlap
-            best_key = disease_key
+    # Tally overlaps through the postings of the query tokens only
+    c = Counter()
+    for keys in postings:
+        c.update(keys)
 
-    if best_overlap < 3:
+    best_overlap = max(c.values())
+    if best_overlap < NLP_MIN_OVERLAP:
         return None
 
+    # Ties go to the disease listed first in the DB
+    best_key = next(k for k in DISEASE_DOCS if c[k] == best_overlap)
+
     print("[NLP] Guessed disease", best_key, "overlap:", best_overlap)
     return best_key
 
-build_disease_index()
+def install_db(db: dict) -> None:
+    """Build every index for `db` first, then publish DB and indexes together."""
+    global DB, DISEASE_DOCS, TOKEN_INDEX, DISEASE_VARIANTS, DISEASE_RE
+    docs, token_index = build_disease_index(db)
+    variants, pattern = build_disease_name_index(db)
+    DB, DISEASE_DOCS, TOKEN_INDEX, DISEASE_VARIANTS, DISEASE_RE = (
+        db, docs, token_index, variants, pattern
+    )
+
+install_db(load_db())
+print("DB loaded keys:", list(DB.keys()))
+
+def reload_db() -> None:
+    """
+    Re-read db.json and rebuild the indexes, re-tokenizing only changed entries.
+    On any failure (missing/half-written file, empty DB) the current DB is kept.
+    """
+    try:
+        with open(DB_PATH, "rb") as f:
+            new_db = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        print("[reload] keeping current DB, could not read", DB_PATH, "-", e)
+        return
+    if not isinstance(new_db, dict) or not new_db:
+        print("[reload] keeping current DB,", DB_PATH, "is empty or not an object")
+        return
+
+    for key, disease_data in new_db.items():
+        old = DB.get(key)
+        if (
+            isinstance(disease_data, dict)
+            and old and "_doc_tokens" in old
+            and old.get("en") == disease_data.get("en")
+        ):
+            disease_data["_doc_tokens"] = old["_doc_tokens"]
+
+    try:
+        install_db(new_db)
+    except Exception as e:  # malformed entries: don't take the bot down over a bad edit
+        print("[reload] keeping current DB, could not index", DB_PATH, "-", repr(e))
+        return
+    print("DB reloaded keys:", list(DB.keys()))
+
+def _on_sighup(signum, frame) -> None:
+    # Don't rebuild inside the signal handler; run it on the event loop
+    # between requests when there is one
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        reload_db()
+        return
+    loop.call_soon_threadsafe(reload_db)
+
+# `kill -HUP <pid>` picks up db.json edits without a restart
+if hasattr(signal, "SIGHUP"):
+    signal.signal(signal.SIGHUP, _on_sighup)
 
 # ------------------ KOCHI HOSPITALS (NEW) ------------------
 # Sources: Aster Medcity, Amrita AIMS, VPS Lakeshore, Rajagiri, Apollo Adlux, Lisie, etc.
@@ -153,17 +429,9 @@ HOSPITALS_KOCHI = [
     }
 ]
 
-# Helper to pick hospitals relevant to a disease key
-def get_hospitals_for_disease(disease_key: str, limit: int = 3) -> list[dict]:
-    """
-    Very simple relevance: match disease-key derived tags to hospital tags.
-    If no tag match, return top multispecialty hospitals.
-    """
-    if not disease_key:
-        return []
-
-    # Build simple keyword -> tag map (extend as needed)
-    keyword_tag_map = {
+# Simple keyword -> tag map (extend as needed); fallback will match multispecialty
+_KEYWORD_TAG_MAP = {
+    kw: frozenset(tags) for kw, tags in {
         "fever": ["emergency", "critical-care", "multispecialty"],
         "dengue": ["emergency", "multispecialty"],
         "malaria": ["emergency", "multispecialty"],
@@ -173,27 +441,46 @@ def get_hospitals_for_disease(disease_key: str, limit: int = 3) -> list[dict]:
         "kidney": ["nephrology", "multispecialty", "transplant"],
         "cancer": ["oncology", "multispecialty"],
         "pregnancy": ["maternity", "multispecialty"],
-        # fallback will match multispecialty
-    }
+    }.items()
+}
+
+# Hospital tags are static, so build their sets once
+_HOSP_TAGSETS = [frozenset(h.get("tags", [])) for h in HOSPITALS_KOCHI]
+
+# Display lines for replies, keyed by hospital name (kept off the dicts so
+# the /chat "hospitals" payload is unchanged)
+HOSPITAL_LINES = {
+    h["name"]: f"• {h['name']} — {h['address']} (☎ {h['phone']})" for h in HOSPITALS_KOCHI
+}
+HOSPITALS_HEADER = "\n\n🏥 *Nearby hospitals in Kochi you can consider:*\n"
+
+# Helper to pick hospitals relevant to a disease key
+@lru_cache(maxsize=256)
+def get_hospitals_for_disease(disease_key: str, limit: int = 3) -> tuple[dict, ...]:
+    """
+    Very simple relevance: match disease-key derived tags to hospital tags.
+    If no tag match, return top multispecialty hospitals.
+    Results are cached, so callers must not mutate the returned dicts.
+    """
+    if not disease_key:
+        return ()
 
     low = disease_key.lower()
     matched_tags = set()
-    for kw, tags in keyword_tag_map.items():
+    for kw, tags in _KEYWORD_TAG_MAP.items():
         if kw in low:
             matched_tags.update(tags)
 
     # Score hospitals by tag overlap
     scored = []
-    for h in HOSPITALS_KOCHI:
-        score = len(matched_tags & set(h.get("tags", [])))
+    for i, tagset in enumerate(_HOSP_TAGSETS):
+        score = len(matched_tags & tagset)
         # prefer hospitals marked multispecialty if no matches
-        if not matched_tags and "multispecialty" in h.get("tags", []):
+        if not matched_tags and "multispecialty" in tagset:
             score += 1
-        scored.append((score, h))
+        scored.append((score, HOSPITALS_KOCHI[i]))
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    results = [h for s, h in scored if s >= 0][:limit]
-    return results
+    return tuple(h for _, h in nlargest(limit, scored, key=itemgetter(0)))
 
 # ------------------ language + greeting texts ------------------
 
@@ -202,6 +489,11 @@ SUPPORTED_LANGS = {"en"}
 GREET_KEYWORDS = {
     "en": ["hi", "hello", "hey", "hai"],
 }
+_GREET_SET = frozenset(GREET_KEYWORDS["en"])
+_GREET_PREFIXES = tuple(g + " " for g in _GREET_SET)
+
+# Substrings that mark a thank-you message ("thank" also covers "thank you")
+THANKS = frozenset({"thank", "thanks", "thx", "ty"})
 
 # HUMANIZED GREETING (NEW: emoji + friendlier tone)
 GREET_MESSAGE = {
@@ -229,63 +521,69 @@ class ChatMessage(BaseModel):
 
 # ------------------ UPDATED search_faq FUNCTION ------------------
 
-def search_db(text: str, lang: str = "en") -> str | None:
+# DB field a query asks about, matched per token by word prefix so
+# inflections ("treated", "prevented", "cures", "preventive") still count.
+# Checked in order: when a query mentions several, symptoms come first.
+_CATEGORY_MATCHERS = (
+    # "sign"/"signs" are exact words so "significant" doesn't match
+    ("symptoms", ("symptom",), frozenset({"sign", "signs"})),
+    ("prevention", ("prevent", "avoid"), frozenset()),
+    ("remedies", ("treat", "remed", "cure"), frozenset()),
+)
+
+def _query_category(tokens: set[str]) -> str:
+    for category, prefixes, words in _CATEGORY_MATCHERS:
+        if any(t.startswith(prefixes) or t in words for t in tokens):
+            return category
+    return "what"
+
+def search_db(
+    text: str,
+    lang: str = "en",
+    lower: str | None = None,
+    tokens: set[str] | None = None,
+) -> tuple[str | None, bool, str | None]:
     """
     English-only.
     If disease matched by NLP → short caution reply.
     If disease explicitly typed → full details.
+    Returns (disease_key, matched_by_key, answer) so callers can reuse the key.
+    `lower`/`tokens` let a caller that already lowercased/tokenized pass them in.
     """
     if not DB or not text:
-        return None
+        return None, False, None
 
-    q_original = text
-    q = text.lower().strip()
+    q = lower if lower is not None else text.lower().strip()
+    if tokens is None:
+        tokens = _tokenize_set(q, already_lower=True)
 
-    disease_key = None
-    matched_by_key = False
     # Direct disease name match
-    for d in DB.keys():
-        d_low = d.lower()
-        variants = {
-            d_low,
-            d_low.replace("_", " "),
-            d_low.replace("-", " "),
-        }
-        if any(v in q for v in variants):
-            disease_key = d
-            matched_by_key = True
-            break
+    disease_key = match_disease_name(q)
+    matched_by_key = disease_key is not None
 
     # NLP guess if name not explicitly mentioned
     if not disease_key:
-        disease_key = nlp_guess_disease(q_original)
+        disease_key = nlp_guess_disease(q, tokens)
 
     if not disease_key:
-        return None
+        return None, False, None
 
     lang_block = DB[disease_key].get("en")
     if not lang_block:
-        return None
+        return disease_key, matched_by_key, None
 
     disease_title = disease_key.replace("_", " ").replace("-", " ").title()
 
     # If matched by NLP → short diagnosis-like message (HUMANISED)
     if not matched_by_key:
-        return (
+        return disease_key, matched_by_key, (
             f"🤖 It looks like your symptoms match *{disease_title}*.\n"
             f"⚠️ This is only an initial guess — please consult a doctor if you feel unwell.\n"
             f"I can also suggest nearby hospitals in Kochi if you'd like."
         )
 
     # User typed the disease → full details
-    category = "what"
-
-    if any(w in q for w in ["symptom", "symptoms", "signs"]):
-        category = "symptoms"
-    elif any(w in q for w in ["prevent", "prevention", "avoid"]):
-        category = "prevention"
-    elif any(w in q for w in ["treat", "treatment", "remedy", "remedies", "cure"]):
-        category = "remedies"
+    category = _query_category(tokens)
 
     data = lang_block.get(category)
     if data is None:
@@ -303,9 +601,10 @@ def search_db(text: str, lang: str = "en") -> str | None:
 
     if isinstance(data, list):
         bullet_lines = "\n".join("• " + item for item in data)
-        return f"💡 *{disease_title} – {heading}*\n{bullet_lines}"
+        answer = f"💡 *{disease_title} – {heading}*\n{bullet_lines}"
     else:
-        return f"💡 *{disease_title} – {heading}*\n{data}"
+        answer = f"💡 *{disease_title} – {heading}*\n{data}"
+    return disease_key, matched_by_key, answer
 
 # ------------------ main logic ------------------
 
@@ -318,12 +617,10 @@ def process_message(text: str, lang: str = "en") -> dict:
         return {"type": "fallback", "answer": GREET_MESSAGE["en"]}
 
     # Greetings
-    for g in GREET_KEYWORDS["en"]:
-        if lower == g or lower.startswith(g + " "):
-            return {"type": "greeting", "answer": GREET_MESSAGE["en"]}
+    if lower in _GREET_SET or lower.startswith(_GREET_PREFIXES):
+        return {"type": "greeting", "answer": GREET_MESSAGE["en"]}
 
     # Thank-you replies
-    THANKS = ["thank", "thanks", "thank you", "thx", "ty"]
     if any(t in lower for t in THANKS):
         return {
             "type": "thanks",
@@ -331,28 +628,16 @@ def process_message(text: str, lang: str = "en") -> dict:
         }
 
     # FAQ
-    db_answer = search_db(text, lang)
+    tokens = _tokenize_set(lower, already_lower=True)
+    disease_key, _, db_answer = search_db(text, lang, lower=lower, tokens=tokens)
     if db_answer:
-        # Determine disease_key again so we can attach hospitals if relevant
-        disease_key = None
-        for d in DB.keys():
-            variants = {d.lower(), d.lower().replace("_", " "), d.lower().replace("-", " ")}
-            if any(v in lower for v in variants):
-                disease_key = d
-                break
-        if not disease_key:
-            disease_key = nlp_guess_disease(text)
-
         payload = {"answer": db_answer}
         if disease_key:
             # Attach hospital suggestions (humanized)
             hospitals = get_hospitals_for_disease(disease_key, limit=3)
-            hosp_text_lines = []
-            for h in hospitals:
-                hosp_text_lines.append(f"• {h['name']} — {h['address']} (☎ {h['phone']})")
-            hosp_block = "\n".join(hosp_text_lines)
+            hosp_block = "\n".join(HOSPITAL_LINES[h["name"]] for h in hospitals)
             payload["hospitals"] = hospitals
-            payload["answer"] += "\n\n🏥 *Nearby hospitals in Kochi you can consider:*\n" + hosp_block
+            payload["answer"] += HOSPITALS_HEADER + hosp_block
         return {"type": "db", "answer": payload}
 
     # Vaccination
@@ -372,38 +657,41 @@ def process_message(text: str, lang: str = "en") -> dict:
     disease_info = diseases_multilang.find_disease(text, "en")
     if disease_info:
         # If this module returns data, also suggest hospitals
-        guessed = nlp_guess_disease(text)  # try to map to DB key if possible
+        # (disease_key is whatever search_db could map the text to, if anything)
         hospitals = []
-        if guessed:
-            hospitals = get_hospitals_for_disease(guessed, limit=3)
+        if disease_key:
+            hospitals = get_hospitals_for_disease(disease_key, limit=3)
         answer_text = "🤝 " + disease_info
         payload = {"answer": answer_text}
         if hospitals:
-            hosp_text_lines = [f"• {h['name']} — {h['address']} (☎ {h['phone']})" for h in hospitals]
             payload["hospitals"] = hospitals
-            payload["answer"] += "\n\n🏥 *Nearby hospitals in Kochi you can consider:*\n" + "\n".join(hosp_text_lines)
+            payload["answer"] += HOSPITALS_HEADER + "\n".join(HOSPITAL_LINES[h["name"]] for h in hospitals)
         return {"type": "disease", "answer": payload}
 
     return {"type": "fallback", "answer": FALLBACK_MESSAGE["en"]}
 
 # ------------------ web UI ------------------
 
+# Read the UI page once at startup instead of hitting the disk per request
+INDEX_PATH = os.path.join("public", "index.html")
+_INDEX_HTML = b"<h1>Ziva</h1><p>UI not found.</p>"
+if os.path.exists(INDEX_PATH):
+    with open(INDEX_PATH, "rb") as f:
+        _INDEX_HTML = f.read()
+
 @app.get("/")
 def index():
-    path = os.path.join("public", "index.html")
-    if os.path.exists(path):
-        return HTMLResponse(open(path, "r", encoding="utf-8").read())
-    return HTMLResponse("<h1>Ziva</h1><p>UI not found.</p>")
+    return HTMLResponse(_INDEX_HTML)
 
 # ------------------ /chat ------------------
 
 @app.post("/chat")
-def chat(msg: ChatMessage):
+async def chat(msg: ChatMessage):
     result = process_message(msg.message, msg.lang)
     # result["answer"] may be a dict payload now (for db/disease types)
     if isinstance(result["answer"], dict):
         payload = result["answer"]
-        return JSONResponse({
+        return ORJSONResponse({
             "type": result["type"],
             "payload": {
                 "answer": payload.get("answer"),
@@ -411,7 +699,7 @@ def chat(msg: ChatMessage):
                 "hospitals": payload.get("hospitals")
             }
         })
-    return JSONResponse({
+    return ORJSONResponse({
         "type": result["type"],
         "payload": {
             "answer": result["answer"],
@@ -420,6 +708,11 @@ def chat(msg: ChatMessage):
     })
 # ------------------ WhatsApp webhook ------------------
 
+# A single-message TwiML reply is small enough to write out directly
+TWIML_HEAD = '<?xml version="1.0" encoding="UTF-8"?><Response><Message>'
+TWIML_TAIL = "</Message></Response>"
+WHATSAPP_ERROR_REPLY = "Sorry, something went wrong."
+
 @app.post("/whatsapp")
 async def whatsapp_webhook(request: Request):
     form = await request.form()
@@ -428,20 +721,16 @@ async def whatsapp_webhook(request: Request):
     lang = "en"
     text = raw_body
 
-    # Parse lang prefix if any (ignored now since only English)
-    lower = raw_body.lower()
-    if lower.startswith("lang:"):
+    # Parse lang prefix if any (ignored now since only English);
+    # only the first five characters are lowercased to check for it
+    if raw_body[:5].lower() == "lang:":
         text = raw_body.split(" ", 1)[-1]
 
     result = process_message(text, lang)
     # handle the new payload structure for WhatsApp: send only the friendly text reply
-    answer = ""
-    if isinstance(result.get("answer"), dict):
-        answer = result["answer"].get("answer") or "Sorry, something went wrong."
-    else:
-        answer = result.get("answer") or "Sorry, something went wrong."
-
-    resp = MessagingResponse()
-    resp.message(answer)
+    answer = result.get("answer")
+    if isinstance(answer, dict):
+        answer = answer.get("answer")
 
-    return PlainTextResponse(content=str(resp), media_type="application/xml")
+    twiml = TWIML_HEAD + xml_escape(answer or WHATSAPP_ERROR_REPLY) + TWIML_TAIL
+    return PlainTextResponse(content=twiml, media_type="application/xml")